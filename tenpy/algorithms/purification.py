@@ -105,6 +105,8 @@ class PurificationTEBD(tebd.Engine):
         Same index strucuture as `self._U`: for each two-site U of the physical time evolution
         the disentangler from the last application. Initialized to identities.
     """
+    _thread_safe_update_bond = False  # the disentanglers rely on `_update_index`
+
     def __init__(self, psi, model, options):
         super().__init__(psi, model, asConfig(options, 'PurificationTEBD'))
         self._disent_iterations = np.zeros(psi.L)
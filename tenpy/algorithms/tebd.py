@@ -43,11 +43,41 @@ import time
 import warnings
 
 from ..linalg import np_conserved as npc
-from .truncation import svd_theta, TruncationError
+from ..linalg.svd_robust import svd as svd_flat
+from .truncation import svd_theta, truncate, TruncationError
+from .truncation import _truncate_options, _truncate_worker
 from ..tools.params import asConfig
+from ..tools.process import get_thread_pool
 from ..linalg.random_matrix import CUE
 
-__all__ = ['Engine', 'RandomUnitaryEvolution']
+__all__ = ['time_evolution', 'Engine', 'QRBasedEngine', 'RandomUnitaryEvolution']
+
+
+def time_evolution(psi, model, options):
+    """Evolve `psi` in real time with TEBD for ``N_steps * dt``.
+
+    Short-cut for running :meth:`Engine.run` on a new :class:`Engine`.
+    Repeated calls with the same parameters need to recalculate the exponentiated bond
+    Hamiltonians; keep the :class:`Engine` around if you evolve in many small chunks.
+
+    Parameters
+    ----------
+    psi : :class:`~tenpy.networks.mps.MPS`
+        Initial state to be time evolved. Modified in place.
+    model : :class:`~tenpy.models.model.NearestNeighborModel`
+        The model representing the Hamiltonian with which we want to evolve.
+    options : dict
+        Further optional parameters as described in :cfg:config:`TEBD`.
+
+    Returns
+    -------
+    trunc_err : :class:`~tenpy.algorithms.truncation.TruncationError`
+        The error of the represented state which is introduced due to the truncation during
+        this time evolution.
+    """
+    engine = Engine(psi, model, options)
+    engine.run()
+    return engine.trunc_err
 
 
 class Engine:
@@ -78,6 +108,36 @@ class Engine:
             Initial value for :attr:`evolved_time`.
         start_trunc_err : :class:`~tenpy.algorithms.truncation.TruncationError`
             Initial truncation error for :attr:`trunc_err`.
+        num_threads : int
+            Number of python threads used to update the (independent) bonds of the same parity
+            in parallel during :meth:`update_step`. Defaults to 1, i.e., no threads.
+            This helps only if the BLAS/LAPACK calls (which release the GIL) dominate;
+            you should reduce the number of threads used by the BLAS library itself
+            (e.g. with ``export OMP_NUM_THREADS=1``, see :mod:`tenpy.tools.process`) accordingly
+            to avoid oversubscribing the available cores.
+        parallel_threshold_chi : int
+            Use the `num_threads` only if the current maximal bond dimension is at least this
+            threshold; for small `chi` the overhead of the threads dominates. Defaults to 32.
+        dense_threshold_size : int
+            With charge conservation, :meth:`update_bond` uses dense numpy arrays (and an SVD for
+            each charge sector separately) if the two-site wave function `theta` has at most
+            this number of entries ``chi_L*d*d*chi_R``; for small `theta`, this avoids the
+            overhead of the block bookkeeping in :mod:`~tenpy.linalg.np_conserved`.
+            Defaults to ``2**16``, e.g. ``chi = 128`` for spin-1/2. Set to 0 to disable.
+        dtype : None | type
+            If not None, convert the tensors of `psi` and the `U_bond` to this dtype, e.g.,
+            ``np.complex64`` for single precision. For TEBD, the truncation error is usually much
+            larger than the floating point errors; single precision halves the memory and
+            speeds up the matrix operations. To make sure that rounding errors don't dominate,
+            single precision requires ``trunc_params['svd_min'] >= 1.e-7``.
+            Real time evolution requires a complex dtype.
+            Defaults to None, i.e., keep the dtype of `psi`.
+        backend : ``'numpy' | 'cupy'``
+            Array library for the dense update steps without charge conservation.
+            With ``'cupy'``, the MPS is copied to the GPU once at the beginning of each
+            :meth:`update` and back at the end, such that the large matrix multiplications and
+            SVDs during the update steps run on the GPU. This requires the `cupy` package,
+            an MPS without charges, and ``num_threads=1``. Defaults to ``'numpy'``.
 
     Attributes
     ----------
@@ -101,12 +161,25 @@ class Engine:
     _U_param : dict
         A dictionary containing the information of the latest created `_U`.
         We don't recalculate `_U` if those parameters didn't change.
+    _U_dense : dict
+        Dense versions of the `_U` for the update with numpy arrays, see :meth:`_dense_U_bond`.
     _trunc_err_bonds : list of :class:`~tenpy.algorithms.truncation.TruncationError`
         The *local* truncation error introduced at each bond, ignoring the errors at other bonds.
         The `i`-th entry is left of site `i`.
     _update_index : None | (int, int)
         The indices ``i_dt,i_bond`` of ``U_bond = self._U[i_dt][i_bond]`` during update_step.
+        Not set for bonds updated in parallel threads.
+    _theta_pipes : list of None | (key, list of :class:`~tenpy.linalg.charges.LegPipe`, array)
+        For each bond the pipes (and `vL_index`) used in the latest :meth:`update_bond` to combine
+        ``theta.combine_legs([('vL', 'p0'), ('p1', 'vR')])``, see :meth:`_get_theta_pipes`.
+    _dense_sectors : list of None | (key, list, array)
+        For each bond the charge sectors of the latest :meth:`_charge_sectors`.
+    _thread_safe_update_bond : bool
+        Class attribute. Whether :meth:`update_bond` can be called in parallel for different
+        bonds of the same parity, i.e., whether :cfg:option:`TEBD.num_threads` is supported.
     """
+    _thread_safe_update_bond = True
+
     def __init__(self, psi, model, options):
         self.options = options = asConfig(options, "TEBD")
         self.verbose = options.verbose
@@ -117,8 +190,41 @@ class Engine:
         self.trunc_err = options.get('start_trunc_err', TruncationError())
         self._U = None
         self._U_param = {}
+        self._U_dense = {}
         self._trunc_err_bonds = [TruncationError() for i in range(psi.L + 1)]
         self._update_index = None
+        self._theta_pipes = [None] * (psi.L + 1)
+        self._dense_sectors = [None] * (psi.L + 1)
+        self.num_threads = options.get('num_threads', 1)
+        self.parallel_threshold_chi = options.get('parallel_threshold_chi', 32)
+        self.dense_threshold_size = options.get('dense_threshold_size', 2**16)
+        self.dtype = options.get('dtype', None)
+        if self.dtype is not None:
+            self.dtype = np.dtype(self.dtype)
+            if np.finfo(self.dtype).eps > 1.e-10:  # single precision
+                svd_min = self.trunc_params.get('svd_min', 1.e-14)
+                if svd_min is None or svd_min < 1.e-7:
+                    raise ValueError("single precision requires trunc_params['svd_min'] >= 1.e-7")
+            self._convert_psi_dtype()
+        self.backend = options.get('backend', 'numpy')
+        if self.backend == 'numpy':
+            self._xp = np
+        elif self.backend == 'cupy':
+            import cupy  # optional dependency
+            self._xp = cupy
+            if not self._use_dense_sweeps():
+                raise ValueError("backend 'cupy' requires an MPS without charges and a "
+                                 "TEBD engine using `_update_dense_sweeps`")
+        else:
+            raise ValueError("unknown backend " + repr(self.backend))
+
+    def _convert_psi_dtype(self):
+        """Convert the tensors of :attr:`psi` to :attr:`dtype`."""
+        psi = self.psi
+        S_dtype = np.finfo(self.dtype).dtype  # the corresponding real type
+        psi._B = [B.astype(self.dtype) for B in psi._B]
+        psi._S = [S.astype(S_dtype) if isinstance(S, np.ndarray) else S for S in psi._S]
+        psi.dtype = self.dtype
 
     @property
     def TEBD_params(self):
@@ -270,7 +376,8 @@ class Engine:
             b1 = 0.42652466131587616168
             a2 = -0.078111158921637922695
             b2 = -0.12039526945509726545
-            return [a1, b1, a2, b2, 0.5 - a1 - a2, 1. - 2 * (b1 + b2)]  # a1 b1 a2 b2 a3 b3
+            # a1 b1 a2 b2 a3 b3 2*a1
+            return [a1, b1, a2, b2, 0.5 - a1 - a2, 1. - 2 * (b1 + b2), 2. * a1]
         # else
         raise ValueError("Unknown order {0!r} for Suzuki Trotter decomposition".format(order))
 
@@ -332,9 +439,11 @@ class Engine:
             return steps
         elif order == '4_opt':
             # symmetric: a1 b1 a2 b2 a3 b3 a2 b2 a2 b1 a1
-            steps = [(0, odd), (1, even), (2, odd), (3, even), (4, odd),  (5, even),
-                     (4, odd), (3, even), (2, odd), (1, even), (0, odd)]  # yapf: disable
-            return steps * N_steps
+            steps = [(1, even), (2, odd), (3, even), (4, odd),  (5, even),
+                     (4, odd), (3, even), (2, odd), (1, even)]  # yapf: disable
+            # U = [a1 steps a1] * N
+            #   = a1 steps [2*a1 steps] * (N-1) a1
+            return [(0, odd)] + steps + ([(6, odd)] + steps) * (N_steps - 1) + [(0, odd)]
         # else
         raise ValueError("Unknown order {0!r} for Suzuki Trotter decomposition".format(order))
 
@@ -367,6 +476,10 @@ class Engine:
             U_param['tau'] = -1.j * delta_t
         else:
             raise ValueError("Invalid value for `type_evo`: " + repr(type_evo))
+        if (self.dtype is not None and type_evo == 'real'
+                and not np.issubdtype(self.dtype, np.complexfloating)):
+            raise ValueError("real time evolution requires a complex `dtype`, got " +
+                             repr(self.dtype))
         if self._U_param == U_param:  # same keys and values as cached
             if self.verbose >= 10:
                 print("Skip recalculation of U with same parameters as before: ", U_param)
@@ -377,10 +490,13 @@ class Engine:
 
         L = self.psi.L
         self._U = []
+        self._U_dense = {}
         for dt in self.suzuki_trotter_time_steps(order):
             U_bond = [
                 self._calc_U_bond(i_bond, dt * delta_t, type_evo, E_offset) for i_bond in range(L)
             ]
+            if self.dtype is not None:
+                U_bond = [U if U is None else U.astype(self.dtype) for U in U_bond]
             self._U.append(U_bond)
         # done
 
@@ -400,8 +516,12 @@ class Engine:
         """
         trunc_err = TruncationError()
         order = self._U_param['order']
-        for U_idx_dt, odd in self.suzuki_trotter_decomposition(order, N_steps):
-            trunc_err += self.update_step(U_idx_dt, odd)
+        decomposition = self.suzuki_trotter_decomposition(order, N_steps)
+        if self._use_dense_sweeps():
+            trunc_err += self._update_dense_sweeps(decomposition)
+        else:
+            for U_idx_dt, odd in decomposition:
+                trunc_err += self.update_step(U_idx_dt, odd)
         self.evolved_time = self.evolved_time + N_steps * self._U_param['tau']
         self.trunc_err = self.trunc_err + trunc_err  # not += : make a copy!
         # (this is done to avoid problems of users storing self.trunc_err after each `update`)
@@ -440,11 +560,22 @@ class Engine:
         """
         Us = self._U[U_idx_dt]
         trunc_err = TruncationError()
+        bonds = []
         for i_bond in np.arange(int(odd) % 2, self.psi.L, 2):
             if Us[i_bond] is None:
                 if self.verbose >= 10:
                     print("Skip U_bond element:", i_bond)
                 continue  # handles finite vs. infinite boundary conditions
+            bonds.append(i_bond)
+        if self._use_threads(bonds):
+            # each bond touches only its own two sites: no need for locks
+            if self.verbose >= 10:
+                print("Apply U_bond elements in parallel", bonds)
+            pool = get_thread_pool(self.num_threads)
+            for err in pool.map(self.update_bond, bonds, [Us[i] for i in bonds]):
+                trunc_err += err
+            return trunc_err
+        for i_bond in bonds:
             if self.verbose >= 10:
                 print("Apply U_bond element", i_bond)
             self._update_index = (U_idx_dt, i_bond)
@@ -452,6 +583,15 @@ class Engine:
         self._update_index = None
         return trunc_err
 
+    def _use_threads(self, bonds):
+        """Whether to update the given `bonds` of the same parity in parallel threads."""
+        if self.num_threads <= 1 or len(bonds) <= 1 or not self._thread_safe_update_bond:
+            return False
+        if max(self.psi.chi) < self.parallel_threshold_chi:
+            return False  # not worth the overhead
+        # for an odd number of sites in an infinite MPS, bonds 0 and L-1 share a site
+        return self.psi.finite or self.psi.L % 2 == 0
+
     def update_bond(self, i, U_bond):
         """Updates the B matrices on a given bond.
 
@@ -480,18 +620,10 @@ class Engine:
         i0, i1 = i - 1, i
         if self.verbose >= 100:
             print("Update sites ({0:d}, {1:d})".format(i0, i1))
+        if self.psi.chinfo.qnumber == 0 or self._theta_size(i) <= self.dense_threshold_size:
+            return self._update_bond_dense(i, U_bond)  # faster without charges or for small chi
         # Construct the theta matrix
-        C = self.psi.get_theta(i0, n=2, formL=0.)  # the two B without the S on the left
-        C = npc.tensordot(U_bond, C, axes=(['p0*', 'p1*'], ['p0', 'p1']))  # apply U
-        C.itranspose(['vL', 'p0', 'p1', 'vR'])
-        theta = C.scale_axis(self.psi.get_SL(i0), 'vL')
-        # now theta is the same as if we had done
-        #   theta = self.psi.get_theta(i0, n=2)
-        #   theta = npc.tensordot(U_bond, theta, axes=(['p0*', 'p1*'], ['p0', 'p1']))  # apply U
-        # but also have C which is the same except the missing "S" on the left
-        # so we don't have to apply inverses of S (see below)
-
-        theta = theta.combine_legs([('vL', 'p0'), ('p1', 'vR')], qconj=[+1, -1])
+        theta, C = self._apply_U_bond(i, U_bond)
         # Perform the SVD and truncate the wavefunction
         U, S, V, trunc_err, renormalize = svd_theta(theta,
                                                     self.trunc_params,
@@ -512,9 +644,7 @@ class Engine:
         # such that we obtain ``B_L = SL**-1 U S = SL**-1 U S V V^dagger = C V^dagger``
         # here, C is the same as theta, but without the `S` on the very left
         # (Note: this requires no inverse if the MPS is initially in 'B' canonical form)
-        B_L = npc.tensordot(C.combine_legs(('p1', 'vR'), pipes=theta.legs[1]),
-                            V.conj(),
-                            axes=['(p1.vR)', '(p1*.vR*)'])
+        B_L = npc.tensordot(C, V.conj(), axes=['(p1.vR)', '(p1*.vR*)']).split_legs(0)
         B_L.ireplace_labels(['vL*', 'p0'], ['vR', 'p'])
         B_L /= renormalize  # re-normalize to <psi|psi> = 1
         self.psi.set_SR(i0, S)
@@ -523,6 +653,323 @@ class Engine:
         self._trunc_err_bonds[i] = self._trunc_err_bonds[i] + trunc_err
         return trunc_err
 
+    def _theta_size(self, i):
+        """Number of entries ``chi_L * d0 * d1 * chi_R`` of `theta` on bond `i`."""
+        B0 = self.psi.get_B(i - 1, None)
+        B1 = self.psi.get_B(i, None)
+        return int(np.prod(B0.shape)) * int(np.prod(B1.shape)) // B1.get_leg('vL').ind_len**2
+
+    def _apply_U_bond(self, i, U_bond):
+        """Apply `U_bond` to the two-site wave function on bond `i`.
+
+        Returns
+        -------
+        theta : :class:`~tenpy.linalg.np_conserved.Array`
+            The two-site wave function ``S B B`` after applying `U_bond`,
+            with legs ``'(vL.p0)', '(p1.vR)'``.
+        C : :class:`~tenpy.linalg.np_conserved.Array`
+            The same as `theta`, but without the `S` on the left, sharing the pipes of `theta`.
+        """
+        i0 = i - 1
+        C = self.psi.get_theta(i0, n=2, formL=0.)  # the two B without the S on the left
+        C = npc.tensordot(U_bond, C, axes=(['p0*', 'p1*'], ['p0', 'p1']))  # apply U
+        C.itranspose(['vL', 'p0', 'p1', 'vR'])
+        pipes, vL_index = self._get_theta_pipes(i, C)
+        C = C.combine_legs([('vL', 'p0'), ('p1', 'vR')], pipes=pipes)
+        theta = C.scale_axis(self.psi.get_SL(i0)[vL_index], '(vL.p0)')
+        # now theta is the same as if we had done
+        #   theta = self.psi.get_theta(i0, n=2)
+        #   theta = npc.tensordot(U_bond, theta, axes=(['p0*', 'p1*'], ['p0', 'p1']))  # apply U
+        #   theta = theta.combine_legs([('vL', 'p0'), ('p1', 'vR')], qconj=[+1, -1])
+        # but also have C which is the same except the missing "S" on the left
+        # so we don't have to apply inverses of S (see update_bond)
+        return theta, C
+
+    def _get_theta_pipes(self, i, theta):
+        """Pipes for ``theta.combine_legs([('vL', 'p0'), ('p1', 'vR')], qconj=[+1, -1])``.
+
+        The :class:`~tenpy.linalg.charges.LegPipe` precomputes the block structure of the
+        combined legs, which is a significant part of the work in :meth:`update_bond` for small
+        bond dimensions. Once the bond dimension saturates, the charges on the virtual
+        legs usually don't change between subsequent updates of a bond, so we keep the pipes
+        of the last update of each bond and reuse them if the legs are still the same.
+
+        Returns
+        -------
+        pipes : list of :class:`~tenpy.linalg.charges.LegPipe`
+            The pipes for ``'(vL.p0)'`` and ``'(p1.vR)'``.
+        vL_index : 1D array
+            For each index of the pipe ``'(vL.p0)'`` the corresponding index of the leg `'vL'`,
+            such that ``theta.scale_axis(S, 'vL')`` is equivalent to scaling the combined
+            leg by ``S[vL_index]``.
+        """
+        legs = [theta.get_leg(label) for label in ['vL', 'p0', 'p1', 'vR']]
+        key = [(leg.qconj, leg.charges.tobytes(), leg.slices.tobytes()) for leg in legs]
+        cached = self._theta_pipes[i]
+        if cached is not None and cached[0] == key:
+            return cached[1:]
+        pipes = [npc.LegPipe(legs[:2], qconj=+1), npc.LegPipe(legs[2:], qconj=-1)]
+        pipe_L = pipes[0]
+        leg_vL, leg_p0 = pipe_L.legs
+        vL_index = np.empty(pipe_L.ind_len, np.intp)
+        for b_start, b_stop, I_s, q_vL, q_p0 in pipe_L.q_map:
+            start = pipe_L.slices[I_s]
+            vL_index[start + b_start:start + b_stop] = np.repeat(
+                np.arange(leg_vL.slices[q_vL], leg_vL.slices[q_vL + 1]),
+                leg_p0.slices[q_p0 + 1] - leg_p0.slices[q_p0])
+        self._theta_pipes[i] = (key, pipes, vL_index)
+        return pipes, vL_index
+
+    def _update_bond_dense(self, i, U_bond):
+        """Same as :meth:`update_bond`, but with dense numpy arrays.
+
+        Without charge conservation, each :class:`~tenpy.linalg.np_conserved.Array` has only a
+        single block, and for small bond dimensions the overhead of the `npc` functions
+        dominates the actual numerical work.
+        The same is true with charge conservation for small `theta`, see
+        :cfg:option:`TEBD.dense_threshold_size`; in that case, we perform the SVD separately for
+        each charge sector of `theta`, see :meth:`_charge_sectors`.
+        Hence we convert to dense numpy arrays, follow the same steps as in :meth:`update_bond`
+        (see :meth:`_dense_bond_update`) and only wrap the new `B` into
+        :class:`~tenpy.linalg.np_conserved.Array` at the end.
+        """
+        i0, i1 = i - 1, i
+        chinfo = self.psi.chinfo
+        B0 = self.psi.get_B(i0, 'B').transpose(['vL', 'p', 'vR'])
+        B1 = self.psi.get_B(i1, 'B').transpose(['vL', 'p', 'vR'])
+        leg_vL, leg_p0 = B0.legs[:2]
+        leg_p1, leg_vR = B1.legs[1:]
+        qtotal_L = B0.qtotal
+        qtotal_R = chinfo.make_valid(B1.qtotal + U_bond.qtotal)
+        if chinfo.qnumber == 0:
+            sectors = None
+        else:
+            sectors, sector_charges = self._charge_sectors(i, B0.legs[:2] + B1.legs[1:],
+                                                           qtotal_L + qtotal_R)
+        xp = self._xp
+        B_L, S, B_R, trunc_err, sector_sizes = self._dense_bond_update(
+            xp.asarray(B0.to_ndarray()), xp.asarray(B1.to_ndarray()),
+            xp.asarray(self.psi.get_SL(i0)), self._dense_U_bond(U_bond), sectors)
+        B_L, S, B_R = self._to_numpy(B_L), self._to_numpy(S), self._to_numpy(B_R)
+        if sectors is None:
+            leg_new = npc.LegCharge.from_trivial(len(S), chinfo, qconj=-1)
+        else:
+            sector_sizes = np.array(sector_sizes)
+            kept = sector_sizes > 0
+            slices = np.append([0], np.cumsum(sector_sizes[kept]))
+            charges = chinfo.make_valid(sector_charges[kept] - qtotal_L)
+            leg_new = npc.LegCharge.from_qind(chinfo, slices, charges, qconj=-1)
+        B_L = npc.Array.from_ndarray(B_L, [leg_vL, leg_p0, leg_new],
+                                     qtotal=qtotal_L,
+                                     labels=['vL', 'p', 'vR'])
+        B_R = npc.Array.from_ndarray(B_R, [leg_new.conj(), leg_p1, leg_vR],
+                                     qtotal=qtotal_R,
+                                     labels=['vL', 'p', 'vR'])
+        self.psi.set_SR(i0, S)
+        self.psi.set_B(i0, B_L, form='B')
+        self.psi.set_B(i1, B_R, form='B')
+        self._trunc_err_bonds[i] = self._trunc_err_bonds[i] + trunc_err
+        return trunc_err
+
+    def _charge_sectors(self, i, legs, qtotal):
+        """Find the charge sectors of the dense `theta` matrix on bond `i`.
+
+        Parameters
+        ----------
+        i : int
+            Bond index.
+        legs : list of :class:`~tenpy.linalg.charges.LegCharge`
+            The legs ``vL, p0, p1, vR`` of `theta`.
+        qtotal : charges
+            The total charge of `theta`.
+
+        Returns
+        -------
+        sectors : list of (1D array, 1D array)
+            For each charge sector the indices of the rows ``(vL.p0)`` and columns
+            ``(p1.vR)`` of the `theta` matrix, i.e., ``theta[np.ix_(rows, cols)]`` is a block.
+        sector_charges : 2D array
+            For each of the `sectors` the charges of the rows.
+        """
+        key = [(leg.qconj, leg.charges.tobytes(), leg.slices.tobytes()) for leg in legs]
+        key.append(qtotal.tobytes())
+        cached = self._dense_sectors[i]
+        if cached is not None and cached[0] == key:
+            return cached[1:]
+        chinfo = self.psi.chinfo
+        q = [leg.qconj * leg.to_qflat() for leg in legs]
+        q_rows = (q[0][:, np.newaxis, :] + q[1][np.newaxis, :, :]).reshape(-1, chinfo.qnumber)
+        q_rows = chinfo.make_valid(q_rows)
+        q_cols = (q[2][:, np.newaxis, :] + q[3][np.newaxis, :, :]).reshape(-1, chinfo.qnumber)
+        q_cols = chinfo.make_valid(qtotal - q_cols)  # rows need this for non-zero entries
+        charges, row_sector = np.unique(q_rows, axis=0, return_inverse=True)
+        sectors = []
+        sector_charges = []
+        for j, charge in enumerate(charges):
+            cols = np.nonzero(np.all(q_cols == charge, axis=1))[0]
+            if len(cols) > 0:
+                sectors.append((np.nonzero(row_sector == j)[0], cols))
+                sector_charges.append(charge)
+        sector_charges = np.array(sector_charges, dtype=charges.dtype).reshape(
+            -1, chinfo.qnumber)
+        self._dense_sectors[i] = (key, sectors, sector_charges)
+        return sectors, sector_charges
+
+    def _dense_bond_update(self, B0, B1, SL, U_bond, sectors=None, trunc_args=None):
+        """Apply `U_bond` to two sites in right-canonical form given as dense arrays.
+
+        The arrays are numpy arrays or (for :cfg:option:`TEBD.backend` ``'cupy'``) cupy arrays.
+
+        Parameters
+        ----------
+        B0, B1 : 3D ndarray
+            The right-canonical `B` on the two sites, with legs ``vL, p, vR``.
+        SL : 1D ndarray
+            The singular values on the left of `B0`.
+        U_bond : 4D ndarray
+            The bond operator with legs ``p0, p1, p0*, p1*``.
+        sectors : None | list of (1D array, 1D array)
+            If given, the charge sectors of `theta` as returned by :meth:`_charge_sectors`,
+            which are decomposed separately.
+        trunc_args : None | tuple
+            If given, the :attr:`trunc_params` as read out by
+            :func:`~tenpy.algorithms.truncation._truncate_options`.
+            Defaults to None, i.e., truncate with :attr:`trunc_params` directly.
+
+        Returns
+        -------
+        B_L, B_R : 3D ndarray
+            The updated right-canonical `B` on the two sites, with legs ``vL, p, vR``.
+        S : 1D ndarray
+            The new singular values between the two sites.
+        trunc_err : :class:`~tenpy.algorithms.truncation.TruncationError`
+            The error introduced by the truncation.
+        sector_sizes : None | list of int
+            For each of the given `sectors` the number of kept singular values;
+            the new `S` are sorted by `sectors`.
+        """
+        xp = self._xp
+        C = xp.tensordot(B0, B1, axes=(2, 0))  # vL p0 p1 vR
+        C = xp.tensordot(C, U_bond, axes=([1, 2], [2, 3])).transpose([0, 2, 3, 1])  # apply U
+        chi_L, d0, d1, chi_R = C.shape
+        C = C.reshape(chi_L, d0, d1 * chi_R)
+        theta = C * SL[:, np.newaxis, np.newaxis]
+        theta = theta.reshape(chi_L * d0, d1 * chi_R)
+        if sectors is not None:
+            svds = [svd_flat(theta[np.ix_(rows, cols)], full_matrices=False)[1:]
+                    for rows, cols in sectors]
+            S = np.concatenate([S_sector for S_sector, _ in svds])
+        elif xp is np:
+            _, S, V = svd_flat(theta, full_matrices=False)
+        else:
+            _, S, V = xp.linalg.svd(theta, full_matrices=False)
+        # truncate, see :func:`~tenpy.algorithms.truncation.svd_theta`
+        renormalize = xp.linalg.norm(S)
+        S = S / renormalize
+        if trunc_args is not None:
+            piv, new_norm, trunc_err = _truncate_worker(self._to_numpy(S), *trunc_args)
+        else:
+            piv, new_norm, trunc_err = truncate(self._to_numpy(S), self.trunc_params)
+        piv = xp.asarray(piv)
+        S = S[piv] / new_norm
+        renormalize *= new_norm
+        if sectors is None:
+            V = V[piv, :]
+            sector_sizes = None
+        else:
+            V = np.zeros((len(S), d1 * chi_R), dtype=theta.dtype)
+            sector_sizes = []
+            start = 0
+            for (rows, cols), (S_sector, V_sector) in zip(sectors, svds):
+                keep = piv[start:start + len(S_sector)]
+                start += len(S_sector)
+                V_sector = V_sector[keep, :]
+                k = sum(sector_sizes)
+                V[k:k + V_sector.shape[0], cols] = V_sector
+                sector_sizes.append(V_sector.shape[0])
+        B_L = xp.tensordot(C, V.conj(), axes=(2, 1)) / renormalize  # B_L = C V^dagger
+        return B_L, S, V.reshape(len(S), d1, chi_R), trunc_err, sector_sizes
+
+    def _dense_U_bond(self, U_bond):
+        """Convert `U_bond` to a dense array with legs ``p0, p1, p0*, p1*``.
+
+        The same `U_bond` is applied in many update steps; we keep the converted arrays
+        until the next :meth:`calc_U`.
+        """
+        cached = self._U_dense.get(id(U_bond))
+        if cached is not None and cached[0] is U_bond:
+            return cached[1]
+        U_dense = self._xp.asarray(U_bond.transpose(['p0', 'p1', 'p0*', 'p1*']).to_ndarray())
+        self._U_dense[id(U_bond)] = (U_bond, U_dense)  # keep U_bond alive: the id stays unique
+        return U_dense
+
+    def _to_numpy(self, a):
+        """Convert an array of the :cfg:option:`TEBD.backend` to a numpy array."""
+        if self._xp is np:
+            return a
+        return self._xp.asnumpy(a)
+
+    def _use_dense_sweeps(self):
+        """Whether :meth:`update` can use :meth:`_update_dense_sweeps`."""
+        return (self.psi.chinfo.qnumber == 0 and self.num_threads == 1
+                and type(self).update_step is Engine.update_step
+                and type(self).update_bond is Engine.update_bond)
+
+    def _update_dense_sweeps(self, decomposition):
+        """Perform the update steps of :meth:`update` on dense numpy arrays.
+
+        Without charges, it's most efficient to convert the `B` of :attr:`psi` to numpy arrays
+        (or cupy arrays, depending on :cfg:option:`TEBD.backend`) only once, perform all the
+        update steps given by `decomposition` with :meth:`_dense_bond_update` and convert back to
+        :class:`~tenpy.linalg.np_conserved.Array` only at the very end.
+
+        Parameters
+        ----------
+        decomposition : list of (int, int)
+            The ``U_idx_dt, odd`` for each :meth:`update_step`,
+            see :meth:`suzuki_trotter_decomposition`.
+
+        Returns
+        -------
+        trunc_err : :class:`~tenpy.algorithms.truncation.TruncationError`
+            The error of the represented state which is introduced due to the truncation during
+            this sequence of update steps.
+        """
+        psi = self.psi
+        L = psi.L
+        xp = self._xp
+        Bs = [psi.get_B(i, 'B').transpose(['vL', 'p', 'vR']).to_ndarray() for i in range(L)]
+        Bs = [xp.asarray(B) for B in Bs]
+        Ss = [xp.asarray(psi.get_SL(i)) for i in range(L)]
+        trunc_err = TruncationError()
+        # the trunc_params are fixed during the sweeps: read them out only once
+        trunc_args = _truncate_options(self.trunc_params)
+        for U_idx_dt, odd in decomposition:
+            Us = self._U[U_idx_dt]
+            for i in range(int(odd) % 2, L, 2):
+                if Us[i] is None:
+                    continue  # handles finite vs. infinite boundary conditions
+                # i - 1 == -1 for i == 0 is the last site of the unit cell, as it should be
+                Bs[i - 1], Ss[i], Bs[i], err, _ = self._dense_bond_update(
+                    Bs[i - 1], Bs[i], Ss[i - 1], self._dense_U_bond(Us[i]), trunc_args=trunc_args)
+                self._trunc_err_bonds[i] = self._trunc_err_bonds[i] + err
+                trunc_err += err
+        # convert back to npc Arrays
+        Bs = [self._to_numpy(B) for B in Bs]
+        Ss = [self._to_numpy(S) for S in Ss]
+        chinfo = psi.chinfo
+        legs_vL = [npc.LegCharge.from_trivial(B.shape[0], chinfo, qconj=+1) for B in Bs]
+        if psi.finite:  # the outermost bonds are not updated
+            legs_vL[0] = psi.get_B(0, None).get_leg('vL')
+            legs_vL.append(psi.get_B(L - 1, None).get_leg('vR').conj())
+        else:
+            legs_vL.append(legs_vL[0])
+        for i in range(L):
+            legs = [legs_vL[i], psi.get_B(i, None).get_leg('p'), legs_vL[i + 1].conj()]
+            psi.set_B(i, npc.Array.from_ndarray(Bs[i], legs, labels=['vL', 'p', 'vR']), form='B')
+            psi.set_SL(i, Ss[i])
+        return trunc_err
+
     def update_imag(self, N_steps):
         """Perform an update suitable for imaginary time evolution.
 
@@ -643,6 +1090,132 @@ class Engine:
         return U.split_legs()
 
 
+class QRBasedEngine(Engine):
+    r"""Version of TEBD which replaces the SVD of the full `theta` by QR decompositions.
+
+    The SVD of the two-site wave function ``theta`` with shape ``(chi*d, chi*d)`` in
+    :meth:`Engine.update_bond` scales as ``O(chi^3 d^3)``.
+    Following :arxiv:`2212.09782`, we instead find an isometry `A_L` approximating the range of
+    ``theta`` from a QR decomposition of ``theta Y0^dagger``, where `Y0` consists of the `chi`
+    rows of the previous right-canonical `B` on site ``i`` and a few random linear combinations
+    of the rows of `theta`, such that the bond dimension can grow by a factor ``1 + cbe_expand``.
+    A second QR of ``A_L^dagger theta = Xi B_R`` yields a small bond matrix `Xi`, which is
+    the only matrix we need to decompose with an SVD.
+    The latter is much cheaper for large `d` and moderate `cbe_expand`.
+
+    The truncation error contains both the weight of `theta` outside the range of `A_L`
+    and the Schmidt values discarded in the SVD of `Xi`.
+    Imaginary time evolution with :meth:`update_imag` still uses the SVD-based update.
+
+    The random sketches are drawn from the global :mod:`numpy.random` state, such that runs can
+    be reproduced by seeding it; hence the bonds are always updated one after another,
+    ignoring :cfg:option:`TEBD.num_threads`.
+
+    Options
+    -------
+    .. cfg:config :: QRBasedEngine
+        :include: TEBD
+
+        cbe_expand : float
+            Expansion rate: the bond dimension can grow by at most ``cbe_expand * chi``
+            (but at least `cbe_min_block_increase` per charge block) in each update.
+            Defaults to 0.1.
+        cbe_min_block_increase : int
+            Minimal number of states added in each charge block. Defaults to 1.
+            Starting from a product state without charge conservation, the bond dimension can
+            then grow only slowly at the beginning; increase this value in that case.
+    """
+    _thread_safe_update_bond = False  # the order of the draws in `_expanded_Y0` has to be fixed
+
+    def __init__(self, psi, model, options):
+        super().__init__(psi, model, asConfig(options, 'QRBasedEngine'))
+        self.cbe_expand = self.options.get('cbe_expand', 0.1)
+        self.cbe_min_block_increase = self.options.get('cbe_min_block_increase', 1)
+
+    def update_bond(self, i, U_bond):
+        """Updates the B matrices on a given bond with QR decompositions instead of SVDs.
+
+        Parameters
+        ----------
+        i : int
+            Bond index; we update the matrices at sites ``i-1, i``.
+        U_bond : :class:`~tenpy.linalg.np_conserved.Array`
+            The bond operator which we apply to the wave function.
+            We expect labels ``'p0', 'p1', 'p0*', 'p1*'``.
+
+        Returns
+        -------
+        trunc_err : :class:`~tenpy.algorithms.truncation.TruncationError`
+            The error of the represented state which is introduced by the truncation
+            during this update step.
+        """
+        i0, i1 = i - 1, i
+        if self.verbose >= 100:
+            print("Update sites ({0:d}, {1:d})".format(i0, i1))
+        # Construct the theta matrix, see Engine.update_bond
+        theta, C = self._apply_U_bond(i, U_bond)
+        Y0 = self._expanded_Y0(i, theta)
+        # find an isometry A_L approximating the range of theta
+        A_L = npc.tensordot(theta, Y0.conj(), axes=['(p1.vR)', '(p1*.vR*)'])
+        A_L, _ = npc.qr(A_L, inner_labels=['vR', 'vL'])  # '(vL.p0)', 'vR'
+        # decompose A_L^dagger theta = Xi B_R with a QR of the transpose
+        theta_i0 = npc.tensordot(A_L.conj(), theta, axes=['(vL*.p0*)', '(vL.p0)'])
+        theta_i0.ireplace_label('vR*', 'vL').itranspose(['(p1.vR)', 'vL'])
+        B_R, Xi = npc.qr(theta_i0, inner_labels=['vL', 'vR'])
+        B_R.itranspose(['vL', '(p1.vR)'])
+        Xi.itranspose(['vL', 'vR'])
+        # SVD of the small bond matrix Xi
+        norm_theta = npc.norm(theta)
+        norm_Xi = npc.norm(Xi)
+        _, S, V, svd_err, renormalize = svd_theta(Xi,
+                                                  self.trunc_params,
+                                                  [self.psi.get_B(i0, None).qtotal, None],
+                                                  inner_labels=['vR', 'vL'])
+        # weight outside the range of A_L + weight discarded in the SVD of Xi
+        eps = 1. - (norm_Xi / norm_theta)**2 * (1. - svd_err.eps)
+        trunc_err = TruncationError(eps, 1. - 2. * eps)
+        B_R = npc.tensordot(V, B_R, axes=['vR', 'vL'])  # 'vL', '(p1.vR)'
+        # ``B_L = SL**-1 theta B_R^dagger = C B_R^dagger``, see Engine.update_bond
+        B_L = npc.tensordot(C, B_R.conj(), axes=['(p1.vR)', '(p1*.vR*)']).split_legs(0)
+        B_L.ireplace_labels(['vL*', 'p0'], ['vR', 'p'])
+        B_L /= renormalize  # re-normalize to <psi|psi> = 1
+        B_R = B_R.split_legs(1).ireplace_label('p1', 'p')
+        self.psi.set_SR(i0, S)
+        self.psi.set_B(i0, B_L, form='B')
+        self.psi.set_B(i1, B_R, form='B')
+        self._trunc_err_bonds[i] = self._trunc_err_bonds[i] + trunc_err
+        return trunc_err
+
+    def _expanded_Y0(self, i, theta):
+        """Rows spanning the guess of the right basis on bond `i`, expanded by a sketch of `theta`.
+
+        Returns
+        -------
+        Y0 : :class:`~tenpy.linalg.np_conserved.Array`
+            Legs ``'vL', '(p1.vR)'``. The first rows are the previous `B` on site `i`,
+            the remaining ones random linear combinations of the rows of `theta` (in each
+            charge block), as in the randomized range finder of :arxiv:`0909.4061`.
+        """
+        B_R = self.psi.get_B(i, 'B').combine_legs(['p', 'vR'], pipes=theta.legs[1])
+        B_R.ireplace_label('(p.vR)', '(p1.vR)')
+        if not self.cbe_expand:
+            return B_R
+        leg = theta.get_leg('(vL.p0)').to_LegCharge()
+        increase = int(self.cbe_expand * B_R.get_leg('vL').ind_len / leg.block_number)
+        increase = max(increase, self.cbe_min_block_increase)
+        mask = np.zeros(leg.ind_len, dtype=np.bool_)
+        for start, stop in zip(leg.slices[:-1], leg.slices[1:]):
+            mask[start:min(start + increase, stop)] = True
+        sketch_leg = leg.project(mask)[2]
+        G = npc.Array.from_func(np.random.standard_normal, [sketch_leg, leg.conj()],
+                                dtype=np.finfo(theta.dtype).dtype,  # real, precision of theta
+                                shape_kw='size',
+                                labels=['vL', '(vL*.p0*)'])
+        Y_theta = npc.tensordot(G, theta, axes=['(vL*.p0*)', '(vL.p0)'])
+        Y_theta = Y_theta.gauge_total_charge('vL', B_R.qtotal)
+        return npc.concatenate([B_R, Y_theta], axis='vL', copy=False)
+
+
 class RandomUnitaryEvolution(Engine):
     """Evolution of an MPS with random two-site unitaries in a TEBD-like fashion.
 
@@ -739,8 +1312,11 @@ class RandomUnitaryEvolution(Engine):
                 pipe = npc.LegPipe([leg_L, leg_R])
                 U = npc.Array.from_func_square(CUE, pipe).split_legs()
                 U.iset_leg_labels(['p0', 'p1', 'p0*', 'p1*'])
+                if self.dtype is not None:
+                    U = U.astype(self.dtype)
                 U_bonds.append(U)
         self._U = [U_bonds]
+        self._U_dense = {}
 
     def update(self, N_steps):
         """Apply ``N_steps`` random two-site unitaries to each bond (in even-odd pattern).
@@ -191,6 +191,16 @@ def truncate(S, options):
     err : :class:`TruncationError`
         The error of the represented state which is introduced due to the truncation.
 
+    """
+    return _truncate_worker(S, *_truncate_options(options))
+
+
+def _truncate_options(options):
+    """Read out the options for :func:`truncate`.
+
+    Returns the arguments ``chi_max, chi_min, deg_tol, svd_min, trunc_cut`` for
+    :func:`_truncate_worker`, such that these can be read out only once if many spectra are
+    truncated with the same options.
     """
     options = asConfig(options, "truncation")
     # by default, only truncate values which are much closer to zero than machine precision.
@@ -207,28 +217,35 @@ def truncate(S, options):
 
     if trunc_cut is not None and trunc_cut >= 1.:
         raise ValueError("trunc_cut >=1.")
-    if not np.any(S > 1.e-10):
-        warnings.warn("no Schmidt value above 1.e-10", stacklevel=2)
-    if np.any(S < -1.e-10):
-        warnings.warn("negative Schmidt values!", stacklevel=2)
+    return chi_max, chi_min, deg_tol, svd_min, trunc_cut
+
+
+def _truncate_worker(S, chi_max, chi_min, deg_tol, svd_min, trunc_cut):
+    """Main work of :func:`truncate` with the options read out by :func:`_truncate_options`."""
+    if not (S > 1.e-10).any():
+        warnings.warn("no Schmidt value above 1.e-10", stacklevel=3)
+    if (S < -1.e-10).any():
+        warnings.warn("negative Schmidt values!", stacklevel=3)
 
     # use 1.e-100 as replacement for <=0 values for a well-defined logarithm.
-    logS = np.log(np.choose(S <= 0., [S, 1.e-100 * np.ones(len(S))]))
+    logS = np.log(np.where(S > 0., S, 1.e-100))
     piv = np.argsort(logS)  # sort *ascending*.
     logS = logS[piv]
+    n = len(piv)
+
     # goal: find an index 'cut' such that we keep piv[cut:], i.e. cut between `cut-1` and `cut`.
-    good = np.ones(len(piv), dtype=np.bool)  # good[cut] = (is `cut` a good choice?)
+    good = np.ones(n, dtype=bool)  # good[cut] = (is `cut` a good choice?)
     # we choose the smallest 'good' cut.
 
     if chi_max is not None:
         # keep at most chi_max values
-        good2 = np.zeros(len(piv), dtype=np.bool)
+        good2 = np.zeros(n, dtype=bool)
         good2[-chi_max:] = True
         good = _combine_constraints(good, good2, "chi_max")
 
     if chi_min is not None and chi_min > 1:
         # keep at most chi_max values
-        good2 = np.ones(len(piv), dtype=np.bool)
+        good2 = np.ones(n, dtype=bool)
         good2[-chi_min + 1:] = False
         good = _combine_constraints(good, good2, "chi_min")
 
@@ -236,7 +253,7 @@ def truncate(S, options):
         # don't cut between values (cut-1, cut) with ``log(S[cut]/S[cut-1]) < deg_tol``
         # this is equivalent to
         # ``(S[cut] - S[cut-1])/S[cut-1] < exp(deg_tol) - 1 = deg_tol + O(deg_tol^2)``
-        good2 = np.empty(len(piv), np.bool)
+        good2 = np.empty(n, bool)
         good2[0] = True
         good2[1:] = np.greater_equal(logS[1:] - logS[:-1], deg_tol)
         good = _combine_constraints(good, good2, "degeneracy_tol")
@@ -250,9 +267,9 @@ def truncate(S, options):
         good2 = (np.cumsum(S[piv]**2) > trunc_cut * trunc_cut)
         good = _combine_constraints(good, good2, "trunc_cut")
 
-    cut = np.nonzero(good)[0][0]  # smallest possible cut: keep as many S as allowed
-    mask = np.zeros(len(S), dtype=np.bool)
-    np.put(mask, piv[cut:], True)
+    cut = np.argmax(good)  # smallest possible cut: keep as many S as allowed
+    mask = np.zeros(len(S), dtype=bool)
+    mask[piv[cut:]] = True
     norm_new = np.linalg.norm(S[mask])
     return mask, norm_new, TruncationError.from_S(S[np.logical_not(mask)]),
 
@@ -325,7 +342,7 @@ def _combine_constraints(good1, good2, warn):
     Otherwise print a warning and return just `good1`.
     """
     res = np.logical_and(good1, good2)
-    if np.any(res):
+    if res.any():
         return res
-    warnings.warn("truncation: can't satisfy constraint for " + warn, stacklevel=3)
+    warnings.warn("truncation: can't satisfy constraint for " + warn, stacklevel=4)
     return good1
@@ -432,16 +432,20 @@ class Array:
                 res.shape, data_flat.shape))
         if qtotal is None:
             res.qtotal = qtotal = detect_qtotal(data_flat, legcharges, cutoff)
+        # find all qindices compatible with qtotal, as in `from_func`
+        qindices = np.array([qi for qi in res._iter_all_blocks()], dtype=np.intp)
+        qindices = qindices.reshape((-1, res.rank))
+        block_charges = res._get_block_charge(qindices.T)  # .T: allows to use 2D `qindices`
+        qdata = qindices[np.all(block_charges == res.qtotal, axis=1)]
         data = []
-        qdata = []
-        for qindices in res._iter_all_blocks():
+        incompatible = np.abs(data_flat)  # copy, set to zero in the compatible blocks
+        for qindices in qdata:
             sl = res._get_block_slices(qindices)
-            if np.all(res._get_block_charge(qindices) == qtotal):
-                data.append(np.array(data_flat[sl], dtype=res.dtype))  # copy data
-                qdata.append(qindices)
-            elif np.any(np.abs(data_flat[sl]) > cutoff):
-                warnings.warn("flat array has non-zero entries in blocks incompatible with charge",
-                              stacklevel=2)
+            data.append(np.array(data_flat[sl], dtype=res.dtype))  # copy data
+            incompatible[sl] = 0.
+        if np.any(incompatible > cutoff):
+            warnings.warn("flat array has non-zero entries in blocks incompatible with charge",
+                          stacklevel=2)
         res._data = data
         res._qdata = np.array(qdata, dtype=np.intp, order='C').reshape((len(qdata), res.rank))
         res._qdata_sorted = True
@@ -40,6 +40,7 @@ import numpy as np
 import scipy
 import scipy.linalg
 import warnings
+from functools import lru_cache
 
 from ctypes import CDLL, POINTER, c_int, c_char
 from ctypes.util import find_library
@@ -112,7 +113,7 @@ def svd(a,
     """
     if lapack_driver == 'gesdd':
         try:
-            return scipy.linalg.svd(a, full_matrices, compute_uv, False, check_finite)
+            return _svd_gesdd(a, full_matrices, compute_uv, check_finite)
         except np.linalg.LinAlgError:
             # 'gesdd' failed to converge, so we continue with the backup plan
             if warn:
@@ -130,6 +131,46 @@ def svd(a,
         return svd_gesvd(a, full_matrices, compute_uv, check_finite)
 
 
+def _svd_gesdd(a, full_matrices, compute_uv, check_finite):
+    """Same as ``scipy.linalg.svd(a, ..., lapack_driver='gesdd')``, but cache the workspace size.
+
+    Algorithms like TEBD and DMRG perform a huge number of SVDs of blocks with the same shapes.
+    :func:`scipy.linalg.svd` looks up the LAPACK function and queries LAPACK for the optimal size
+    of the workspace for each call, which is a significant overhead for small blocks.
+    We cache these for each shape and dtype with :func:`_gesdd_lwork`.
+    """
+    a = np.asarray_chkfinite(a) if check_finite else np.asarray(a)
+    if _old_scipy or a.ndim != 2 or a.size == 0 or a.dtype.char not in 'fdFD':
+        return scipy.linalg.svd(a, full_matrices, compute_uv, False, False)
+    m, n = a.shape
+    gesdd, lwork = _gesdd_lwork(a.dtype.char, m, n, bool(compute_uv), bool(full_matrices))
+    u, s, vt, info = gesdd(a,
+                           compute_uv=compute_uv,
+                           lwork=lwork,
+                           full_matrices=full_matrices,
+                           overwrite_a=False)
+    if info > 0:
+        raise LinAlgError("SVD did not converge")
+    if info < 0:
+        raise ValueError("illegal value in {0:d}th argument of internal gesdd".format(-info))
+    if compute_uv:
+        return u, s, vt
+    return s
+
+
+@lru_cache(maxsize=1024)
+def _gesdd_lwork(typecode, m, n, compute_uv, full_matrices):
+    """Return LAPACK's `#gesdd` for the given dtype and the optimal `lwork` for the shape."""
+    dtype = np.dtype(typecode)
+    gesdd, gesdd_lwork = scipy.linalg.get_lapack_funcs(('gesdd', 'gesdd_lwork'), dtype=dtype)
+    work, info = gesdd_lwork(m, n, compute_uv=compute_uv, full_matrices=full_matrices)
+    if info != 0:
+        raise ValueError("internal gesdd_lwork returned info={0:d}".format(info))
+    # `work` is returned as float of the same precision: round up generously
+    lwork = int(np.real(work) * (1. + 4. * np.finfo(dtype).eps)) + 1
+    return gesdd, lwork
+
+
 def svd_gesvd(a, full_matrices=True, compute_uv=True, check_finite=True):
     """svd with LAPACK's '#gesvd' (with # = d/z for float/complex).
 
@@ -50,6 +50,7 @@ from .terms import OnsiteTerms, CouplingTerms, MultiCouplingTerms
 from ..tools.misc import add_with_None_0
 from ..tools.math import lcm
 from ..tools.params import asConfig
+from ..tools.optimization import optimize, OptimizationFlag
 from ..algorithms.truncation import TruncationError, svd_theta
 
 __all__ = ['MPO', 'make_W_II', 'MPOGraph', 'MPOEnvironment', 'grid_insert_ops']
@@ -293,6 +294,8 @@ class MPO:
 
     def test_sanity(self):
         """Sanity check, raises ValueErrors, if something is wrong."""
+        if optimize(OptimizationFlag.skip_arg_checks):
+            return
         assert self.L == len(self.sites)
         if self.bc not in self._valid_bc:
             raise ValueError("invalid MPO boundary conditions: " + repr(self.bc))
@@ -1750,6 +1753,8 @@ class MPOEnvironment(MPSEnvironment):
 
     def test_sanity(self):
         """Sanity check, raises ValueErrors, if something is wrong."""
+        if optimize(OptimizationFlag.skip_arg_checks):
+            return
         assert (self.bra.finite == self.ket.finite == self.H.finite == self._finite)
         # check that the network is contractable
         for b_s, H_s, k_s in zip(self.bra.sites, self.H.sites, self.ket.sites):
@@ -84,9 +84,11 @@ import scipy.sparse.linalg.eigen.arpack
 from ..linalg import np_conserved as npc
 from ..linalg import sparse
 from .site import GroupedSite, group_sites
-from ..tools.misc import to_iterable, argsort, to_array
+from ..tools.misc import to_iterable, argsort, to_array, inverse_permutation
 from ..tools.math import lcm, speigs, entropy
 from ..tools.params import asConfig
+from ..tools.optimization import optimize, OptimizationFlag
+from ..tools.process import get_thread_pool
 from ..algorithms.truncation import TruncationError, svd_theta
 
 __all__ = ['MPS', 'MPSEnvironment', 'TransferMatrix', 'build_initial_state']
@@ -197,6 +199,8 @@ class MPS:
 
     def test_sanity(self):
         """Sanity check, raises ValueErrors, if something is wrong."""
+        if optimize(OptimizationFlag.skip_arg_checks):
+            return
         if self.bc not in self._valid_bc:
             raise ValueError("invalid boundary condition: " + repr(self.bc))
         if len(self._B) != self.L:
@@ -474,6 +478,7 @@ class MPS:
             raise ValueError("Length of p_state does not match number of sites.")
         ci = sites[0].leg.chinfo
         Bs = []
+        p_indices = []  # the physical index on each site, as long as we have basis states only
         chargeL = ci.make_valid(chargeL)  # sets to zero if `None`
         legL = npc.LegCharge.from_qflat(ci, [chargeL])  # (no need to bunch)
         for p_st, site in zip(p_state, sites):
@@ -487,15 +492,36 @@ class MPS:
                 # just an int for p_st
                 B = np.zeros((site.dim, 1, 1), dtype)
                 B[p_st, 0, 0] = 1.0
+                if p_indices is not None:
+                    p_indices.append(inverse_permutation(site.perm)[p_st] if perm else p_st)
             else:  # iter works
                 if len(p_st) != site.dim:
                     raise ValueError("p_state incompatible with local dim:" + repr(p_st))
                 B = np.array(p_st, dtype).reshape((site.dim, 1, 1))
+                p_indices = None
             if perm:
                 B = B[site.perm, :, :]
             Bs.append(B)
         SVs = [[1.]] * (L + 1)
-        return cls.from_Bflat(sites, Bs, SVs, bc, dtype, False, form, legL)
+        if p_indices is None:
+            return cls.from_Bflat(sites, Bs, SVs, bc, dtype, False, form, legL)
+        # product of basis states: we know the charges of the single non-zero entry of each B,
+        # so we can avoid the detection of the charges in `from_Bflat`.
+        Bs = []
+        for p_ind, site in zip(p_indices, sites):
+            p_leg = site.leg
+            chargeR = ci.make_valid(p_leg.get_charge(p_leg.get_qindex(p_ind)[0]) +
+                                    legL.get_charge(0))
+            legR = npc.LegCharge.from_qflat(ci, [chargeR], qconj=-1)
+            B = npc.zeros([p_leg, legL, legR], dtype, labels=['p', 'vL', 'vR'])
+            B[p_ind, 0, 0] = 1.
+            Bs.append(B)
+            legL = legR.conj()  # prepare for next site
+        if bc == 'infinite':
+            # as in `from_Bflat`: gauge `qtotal` of the last `B` to match the first leg.
+            chdiff = Bs[-1].get_leg('vR').charges[0] - Bs[0].get_leg('vL').charges[0]
+            Bs[-1] = Bs[-1].gauge_total_charge('vR', ci.make_valid(chdiff))
+        return cls(sites, Bs, SVs, form=form, bc=bc)
 
     @classmethod
     def from_Bflat(cls,
@@ -1617,7 +1643,8 @@ class MPS:
         Returns
         -------
         coords : 2D array
-            Coordinates for the mutinf array.
+            Coordinates ``i, j`` (with ``i < j``) for the mutinf array, sorted by `i` and then `j`.
+            You can use ``{(i, j): k for k, (i, j) in enumerate(coords)}`` to look up `k`.
         mutinf : 1D array
             ``mutinf[k]`` is the mutual information :math:`I(i:j)` between the
             sites ``i, j = coords[k]``.
@@ -2188,11 +2215,12 @@ class MPS:
             warnings.warn("MPS correlation function can't use the hermitian flag", stacklevel=2)
             hermitian = False
         C = np.empty((len(sites1), len(sites2)), dtype=np.complex)
+        cache = {}  # for _corr_up_diag with `ops2` on the right
         for x, i in enumerate(sites1):
             # j > i
             j_gtr = sites2[sites2 > i]
             if len(j_gtr) > 0:
-                C_gtr = self._corr_up_diag(ops1, ops2, i, j_gtr, opstr, str_on_first, True)
+                C_gtr = self._corr_up_diag(ops1, ops2, i, j_gtr, opstr, str_on_first, True, cache)
                 C[x, (sites2 > i)] = C_gtr
                 if hermitian:
                     C[x + 1:, x] = np.conj(C_gtr)
@@ -2204,11 +2232,12 @@ class MPS:
                 C[x, (sites2 == i)] = self.expectation_value(op12, i, [['p'], ['p*']])
         if not hermitian:
             #  j < i
+            cache = {}  # for _corr_up_diag with `ops1` on the right
             for y, j in enumerate(sites2):
                 i_gtr = sites1[sites1 > j]
                 if len(i_gtr) > 0:
                     C[(sites1 > j), y] = self._corr_up_diag(ops2, ops1, j, i_gtr, opstr,
-                                                            str_on_first, False)
+                                                            str_on_first, False, cache)
                     # exchange ops1 and ops2 : they commute on different sites,
                     # but we apply opstr after op1 (using the last argument = False)
         return np.real_if_close(C)
@@ -2280,6 +2309,7 @@ class MPS:
             raise ValueError("i_L/i_R not such that term_L is left of term_R")
         axes = [['vL*'] + self._get_p_label('*'), ['vR*'] + self._p_label]
         result = []
+        CRs = {}  # for infinite MPS, CR only depends on `j` modulo `L`
         for j in j_R:
             j = j + j_min  # start ops_R on site `j`
             assert i <= j
@@ -2293,7 +2323,9 @@ class MPS:
                     CL = npc.tensordot(opstr_k, CL, axes=['p*', 'p'])
                 CL = npc.tensordot(B.conj(), CL, axes=axes)
                 i = k + 1
-            CR = self._corr_ops_RP(ops_R, j)
+            CR = CRs.get(self._to_valid_index(j), None)
+            if CR is None:
+                CR = CRs[self._to_valid_index(j)] = self._corr_ops_RP(ops_R, j)
             result.append(npc.inner(CL, CR, axes=[['vR', 'vR*'], ['vL', 'vL*']]))
         return np.real_if_close(result)
 
@@ -2361,6 +2393,7 @@ class MPS:
             raise ValueError("i_L not such that term_L is left of term_R")
         axes = [self._p_label + ['vL*'], self._get_p_label('*') + ['vR*']]
         result = []
+        CLs = {}  # for infinite MPS, CL only depends on `i` modulo `L`
         for i in i_L:
             i0 = i + i_min + len(ops_L) - 1  # CL of term_L includes site `i0` as right-most
             assert i0 <= j
@@ -2373,7 +2406,9 @@ class MPS:
                     CR = npc.tensordot(opstr_k, CR, axes=['p*', 'p'])
                 CR = npc.tensordot(CR, B.conj(), axes=axes)
                 j = k
-            CL = self._corr_ops_LP(ops_L, i + i_min)
+            CL = CLs.get(self._to_valid_index(i + i_min), None)
+            if CL is None:
+                CL = CLs[self._to_valid_index(i + i_min)] = self._corr_ops_LP(ops_L, i + i_min)
             result.append(npc.inner(CL, CR, axes=[['vR', 'vR*'], ['vL', 'vL*']]))
         return np.real_if_close(result)
 
@@ -2868,9 +2903,15 @@ class MPS:
         self.sites[self._to_valid_index(i + 1)] = siteL
         return err
 
-    def permute_sites(self, perm, swap_op='auto', trunc_par={}, verbose=0):
+    def permute_sites(self, perm, swap_op='auto', trunc_par=None, verbose=0, num_threads=1):
         """Applies the permutation perm to the state (inplace).
 
+        The permutation is decomposed into swaps of neighboring sites with :meth:`swap_sites`.
+        By default, they are done one after another in the order of an insertion sort, keeping
+        sites close together. For `num_threads` > 1, the swaps are instead grouped into layers of
+        swaps on non-overlapping bonds, similar as the even/odd bonds in TEBD; the swaps within
+        a layer are independent of each other and are done in parallel.
+
         Parameters
         ----------
         perm : ndarray[ndim=1, int]
@@ -2881,9 +2922,12 @@ class MPS:
             see :meth:`swap_sites`.
         trunc_par : dict
             Parameters for truncation, see :cfg:config:`truncation`.
-            Defaults to ``{'chi_max': max(self.chi)}``.
+            Defaults to ``{'chi_max': max(self.chi), 'verbose': verbose / 10.}``.
         verbose : float
             Level of verbosity, print status messages if verbose > 0.
+        num_threads : int
+            Number of python threads used to do the swaps of a layer in parallel.
+            Defaults to 1, i.e., no threads and no layers.
 
         Returns
         -------
@@ -2891,33 +2935,67 @@ class MPS:
             The error of the represented state introduced by the truncation after the swaps.
         """
         perm = list(perm)  # gets modified, so we should copy
-        # In order to keep sites close together, we always scan from the left,
-        # keeping everything up to `i` in strictly ascending order.
-        # => more or less an 'insertion' sort algorithm.
-        # Works nicely for permutations like [1,2,3,0,6,7,8,5] (swapping the 0 and 5 around).
-        # For [ 2 3 4 5 6 7 0 1], it splits 0 and 1 apart (first swapping the 0 down, then the 1)
+        if trunc_par is None:
+            trunc_par = {}
         trunc_par.setdefault('chi_max', max(self.chi))
+        trunc_par.setdefault('verbose', verbose / 10.)
         trunc_err = TruncationError()
         num_swaps = 0
-        i = 0
-        while i < self.L - 1:
-            if perm[i] > perm[i + 1]:
-                if verbose > 1:
-                    print(i, ": chi = ", self._S[i + 1].shape[0], end='')
-                trunc = self.swap_sites(i, swap_op, trunc_par)
-                if verbose > 1:
-                    print("->", self._S[i + 1].shape[0], ". eps = ", trunc.eps)
-                num_swaps += 1
-                x, y = perm[i], perm[i + 1]
-                perm[i + 1], perm[i] = x, y
-                # restart from very left; but we know it's already sorted up to i-1
-                if i > 0:
-                    i -= 1
-                trunc_err += trunc
-            else:
-                i += 1
+        num_layers = 0
+        if num_threads <= 1:
+            # In order to keep sites close together, we always scan from the left,
+            # keeping everything up to `i` in strictly ascending order.
+            # => more or less an 'insertion' sort algorithm.
+            # Works nicely for permutations like [1,2,3,0,6,7,8,5] (swapping the 0 and 5 around).
+            # For [ 2 3 4 5 6 7 0 1], it splits 0 and 1 apart
+            # (first swapping the 0 down, then the 1).
+            i = 0
+            while i < self.L - 1:
+                if perm[i] > perm[i + 1]:
+                    if verbose > 1:
+                        print(i, ": chi = ", self._S[i + 1].shape[0], end='')
+                    trunc = self.swap_sites(i, swap_op, trunc_par)
+                    if verbose > 1:
+                        print("->", self._S[i + 1].shape[0], ". eps = ", trunc.eps)
+                    num_swaps += 1
+                    x, y = perm[i], perm[i + 1]
+                    perm[i + 1], perm[i] = x, y
+                    # restart from very left; but we know it's already sorted up to i-1
+                    if i > 0:
+                        i -= 1
+                    trunc_err += trunc
+                else:
+                    i += 1
+        else:
+            # Each swap of neighboring sites with perm[i] > perm[i+1] removes exactly one
+            # inversion, so the number of swaps is the same as for the insertion sort above.
+            pool = get_thread_pool(num_threads)
+            while True:
+                # greedily find a maximal layer of non-overlapping bonds to be swapped
+                bonds = []
+                i = 0
+                while i < self.L - 1:
+                    if perm[i] > perm[i + 1]:
+                        bonds.append(i)
+                        perm[i], perm[i + 1] = perm[i + 1], perm[i]
+                        i += 2
+                    else:
+                        i += 1
+                if len(bonds) == 0:
+                    break
+                # each swap touches only its own two sites and the bond in between
+                errs = pool.map(self.swap_sites, bonds, [swap_op] * len(bonds),
+                                [trunc_par] * len(bonds))
+                for trunc in errs:
+                    trunc_err += trunc
+                num_swaps += len(bonds)
+                num_layers += 1
         if verbose > 0:
-            print("Total swaps in permute_sites:", num_swaps, repr(trunc_err))
+            if num_layers > 0:
+                print("Total swaps in permute_sites:", num_swaps, "in", num_layers, "layers,",
+                      "max(chi) =", max(self.chi), repr(trunc_err))
+            else:
+                print("Total swaps in permute_sites:", num_swaps, repr(trunc_err))
         return trunc_err
 
     def compute_K(self, perm, swap_op='auto', trunc_par=None, canonicalize=1.e-6, verbose=0):
@@ -3244,8 +3322,23 @@ class MPS:
         sites2 = np.sort(sites2)
         return ops1, ops2, sites1, sites2, opstr
 
-    def _corr_up_diag(self, ops1, ops2, i, j_gtr, opstr, str_on_first, apply_opstr_first):
-        """correlation function above the diagonal: for fixed i and all j in j_gtr, j > i."""
+    def _corr_up_diag(self,
+                      ops1,
+                      ops2,
+                      i,
+                      j_gtr,
+                      opstr,
+                      str_on_first,
+                      apply_opstr_first,
+                      cache=None):
+        """correlation function above the diagonal: for fixed i and all j in j_gtr, j > i.
+
+        The contractions of ``B[r].conj()`` with ``ops2[r]`` and ``opstr[r]`` don't depend on `i`;
+        they are saved in the `cache` dictionary, which can be shared between the calls for
+        different `i` with the same `ops2` and `opstr`.
+        """
+        if cache is None:
+            cache = {}
         op1 = self.get_op(ops1, i)
         opstr1 = self.get_op(opstr, i)
         if opstr1 is not None and str_on_first:
@@ -3259,17 +3352,25 @@ class MPS:
         res = []
         for r in range(i + 1, js[0] + 1):  # js[0] is the maximum
             B = self.get_B(r, form='B')
-            C = npc.tensordot(C, B, axes=['vR', 'vL'])
+            C = npc.tensordot(C, B, axes=['vR', 'vL'])  # 'vR*', 'p', 'vR'
             if r == js[-1]:
-                Cij = npc.tensordot(self.get_op(ops2, r), C, axes=['p*', 'p'])
-                Cij = npc.inner(B.conj(), Cij, axes=[['vL*', 'p*', 'vR*'], ['vR*', 'p', 'vR']])
+                op2_Bc = cache.get(('op2', r))
+                if op2_Bc is None:
+                    op2_Bc = npc.tensordot(self.get_op(ops2, r), B.conj(), axes=['p', 'p*'])
+                    cache[('op2', r)] = op2_Bc  # 'p*', 'vL*', 'vR*'
+                Cij = npc.inner(op2_Bc, C, axes=[['vL*', 'p*', 'vR*'], ['vR*', 'p', 'vR']])
                 res.append(Cij)
                 js.pop()
             if len(js) > 0:
-                op = self.get_op(opstr, r)
-                if op is not None:
-                    C = npc.tensordot(op, C, axes=['p*', 'p'])
-                C = npc.tensordot(B.conj(), C, axes=[['vL*', 'p*'], ['vR*', 'p']])
+                opstr_Bc = cache.get(('opstr', r))
+                if opstr_Bc is None:
+                    op = self.get_op(opstr, r)
+                    if op is not None:
+                        opstr_Bc = npc.tensordot(op, B.conj(), axes=['p', 'p*'])
+                    else:
+                        opstr_Bc = B.conj()
+                    cache[('opstr', r)] = opstr_Bc
+                C = npc.tensordot(opstr_Bc, C, axes=[['vL*', 'p*'], ['vR*', 'p']])
         return res
 
     def _canonical_form_dominant_gram_matrix(self, bond0, transpose, tol_xi, guess=None):
@@ -3516,6 +3617,8 @@ class MPSEnvironment:
 
     def test_sanity(self):
         """Sanity check, raises ValueErrors, if something is wrong."""
+        if optimize(OptimizationFlag.skip_arg_checks):
+            return
         assert (self.bra.finite == self.ket.finite == self._finite)
         # check that the network is contractible
         for i in range(self.L):
@@ -3811,29 +3914,37 @@ class MPSEnvironment:
             RP = self.get_RP(i + n - 1, store=True)
             op = self.ket.get_op(ops, i)
             op = op.replace_labels(op_ax_p + op_ax_pstar, ax_p + ax_pstar)
-            C = self.ket.get_theta(i, n)
-            C = npc.tensordot(op, C, axes=[ax_pstar, ax_p])  # same labels
+            theta_ket = self.ket.get_theta(i, n)
+            C = npc.tensordot(op, theta_ket, axes=[ax_pstar, ax_p])  # same labels
             C = npc.tensordot(LP, C, axes=['vR', 'vL'])  # axes_p + (vR*, vR)
             C = npc.tensordot(C, RP, axes=['vR', 'vL'])  # axes_p + (vR*, vL*)
             C.ireplace_labels(['vR*', 'vL*'], ['vL', 'vR'])  # back to original theta labels
-            theta_bra = self.bra.get_theta(i, n)
+            if self.bra is self.ket:
+                theta_bra = theta_ket
+            else:
+                theta_bra = self.bra.get_theta(i, n)
             E.append(npc.inner(theta_bra, C, axes='labels', do_conj=True))
         return np.real_if_close(np.array(E)) * self.bra.norm * self.ket.norm
 
     def _contract_LP(self, i, LP):
         """Contract LP with the tensors on site `i` to form ``self._LP[i+1]``"""
-        LP = npc.tensordot(LP, self.ket.get_B(i, form='A'), axes=('vR', 'vL'))
+        A_ket = self.ket.get_B(i, form='A')
+        # for bra == ket, reuse the tensor instead of converting it to 'A' form again
+        A_bra = A_ket if self.bra is self.ket else self.bra.get_B(i, form='A')
+        LP = npc.tensordot(LP, A_ket, axes=('vR', 'vL'))
         axes = (self.ket._get_p_label('*') + ['vL*'], self.ket._p_label + ['vR*'])
         # for a ususal MPS, axes = (['p*', 'vL*'], ['p', 'vR*'])
-        LP = npc.tensordot(self.bra.get_B(i, form='A').conj(), LP, axes=axes)
+        LP = npc.tensordot(A_bra.conj(), LP, axes=axes)
         return LP  # labels 'vR*', 'vR'
 
     def _contract_RP(self, i, RP):
         """Contract RP with the tensors on site `i` to form ``self._RP[i-1]``"""
-        RP = npc.tensordot(self.ket.get_B(i, form='B'), RP, axes=('vR', 'vL'))
+        B_ket = self.ket.get_B(i, form='B')
+        B_bra = B_ket if self.bra is self.ket else self.bra.get_B(i, form='B')
+        RP = npc.tensordot(B_ket, RP, axes=('vR', 'vL'))
         axes = (self.ket._p_label + ['vL*'], self.ket._get_p_label('*') + ['vR*'])
         # for a ususal MPS, axes = (['p', 'vL*'], ['p*', 'vR*'])
-        RP = npc.tensordot(RP, self.bra.get_B(i, form='B').conj(), axes=axes)
+        RP = npc.tensordot(RP, B_bra.conj(), axes=axes)
         return RP  # labels 'vL', 'vL*'
 
     def _to_valid_index(self, i):
@@ -117,6 +117,7 @@ import numpy as np
 from .mps import MPS
 from ..linalg import np_conserved as npc
 from ..tools.math import entropy
+from ..tools.optimization import optimize, OptimizationFlag
 
 __all__ = ['PurificationMPS']
 
@@ -148,6 +149,8 @@ class PurificationMPS(MPS):
 
     def test_sanity(self):
         """Sanity check, raises ValueErrors, if something is wrong."""
+        if optimize(OptimizationFlag.skip_arg_checks):
+            return
         for B in self._B:
             if not set(['vL', 'vR', 'p', 'q']) <= set(B.get_leg_labels()):
                 raise ValueError("B has wrong labels " + repr(B.get_leg_labels()))
@@ -270,7 +273,8 @@ class PurificationMPS(MPS):
         Returns
         -------
         coords : 2D array
-            Coordinates for the mutinf array.
+            Coordinates ``i, j`` (with ``i < j``) for the mutinf array, sorted by `i` and then `j`.
+            You can use ``{(i, j): k for k, (i, j) in enumerate(coords)}`` to look up `k`.
         mutinf : 1D array
             ``mutinf[k]`` is the mutual information :math:`I(i:j)` between the
             sites ``i, j = coords[k]``.
@@ -322,9 +326,19 @@ class PurificationMPS(MPS):
     def swap_sites(self, i, swapOP='auto', trunc_par={}):
         raise NotImplementedError()
 
-    def _corr_up_diag(self, ops1, ops2, i, j_gtr, opstr, str_on_first, apply_opstr_first):
+    def _corr_up_diag(self,
+                      ops1,
+                      ops2,
+                      i,
+                      j_gtr,
+                      opstr,
+                      str_on_first,
+                      apply_opstr_first,
+                      cache=None):
         """correlation function above the diagonal: for fixed i and all j in j_gtr, j > i."""
         # compared to MPS._corr_up_diag just perform additional contractions of the 'q'
+        if cache is None:
+            cache = {}
         op1 = self.get_op(ops1, i)
         opstr1 = self.get_op(opstr, i)
         if opstr1 is not None:
@@ -340,17 +354,25 @@ class PurificationMPS(MPS):
             B = self.get_B(r, form='B')
             C = npc.tensordot(C, B, axes=['vR', 'vL'])
             if r == js[-1]:
-                Cij = npc.tensordot(self.get_op(ops2, r), C, axes=['p*', 'p'])
-                Cij = npc.inner(B.conj(),
-                                Cij,
+                op2_Bc = cache.get(('op2', r))
+                if op2_Bc is None:
+                    op2_Bc = npc.tensordot(self.get_op(ops2, r), B.conj(), axes=['p', 'p*'])
+                    cache[('op2', r)] = op2_Bc
+                Cij = npc.inner(op2_Bc,
+                                C,
                                 axes=[['vL*', 'p*', 'q*', 'vR*'], ['vR*', 'p', 'q', 'vR']])
                 res.append(Cij)
                 js.pop()
             if len(js) > 0:
-                op = self.get_op(opstr, r)
-                if op is not None:
-                    C = npc.tensordot(op, C, axes=['p*', 'p'])
-                C = npc.tensordot(B.conj(), C, axes=[['vL*', 'p*', 'q*'], ['vR*', 'p', 'q']])
+                opstr_Bc = cache.get(('opstr', r))
+                if opstr_Bc is None:
+                    op = self.get_op(opstr, r)
+                    if op is not None:
+                        opstr_Bc = npc.tensordot(op, B.conj(), axes=['p', 'p*'])
+                    else:
+                        opstr_Bc = B.conj()
+                    cache[('opstr', r)] = opstr_Bc
+                C = npc.tensordot(opstr_Bc, C, axes=[['vL*', 'p*', 'q*'], ['vR*', 'p', 'q']])
         return res
 
     def _replace_p_label(self, A, s):
@@ -12,19 +12,24 @@ Alternatively, this module provides :func:`omp_get_nthreads` and :func:`omp_set_
 which give their best to get and set the number of threads at runtime,
 while still being failsave if the shared OpenMP library is not found.  In the latter case,
 you might also try the equivalent :func:`mkl_get_nthreads` and :func:`mkl_set_nthreads`.
+
+For python threads, e.g. with :cfg:option:`TEBD.num_threads`, the algorithms share the
+pools returned by :func:`get_thread_pool`.
 """
 # Copyright 2018-2020 TeNPy Developers, GNU GPLv3
 
 import warnings
 import ctypes
 from ctypes.util import find_library
+from concurrent.futures import ThreadPoolExecutor
 
 __all__ = [
     'memory_usage', 'load_omp_library', 'omp_get_nthreads', 'omp_set_nthreads', 'mkl_get_nthreads',
-    'mkl_set_nthreads'
+    'mkl_set_nthreads', 'get_thread_pool'
 ]
 
 _omp_lib = None
+_thread_pools = {}  # num_threads -> ThreadPoolExecutor
 
 
 def memory_usage():
@@ -168,3 +173,23 @@ def mkl_set_nthreads(n):
         except OSError:
             warnings.warn("MKL library not found: can't set nthreads")
     return False
+
+
+def get_thread_pool(num_threads):
+    """Return a ThreadPoolExecutor with `num_threads` workers, re-used between calls.
+
+    Parameters
+    ----------
+    num_threads : int
+        The number of worker threads.
+
+    Returns
+    -------
+    pool : :class:`concurrent.futures.ThreadPoolExecutor`
+        The pool with `num_threads` workers, created at the first call.
+        Don't shut it down, it is shared between the algorithms.
+    """
+    pool = _thread_pools.get(num_threads, None)
+    if pool is None:
+        pool = _thread_pools[num_threads] = ThreadPoolExecutor(max_workers=num_threads)
+    return pool
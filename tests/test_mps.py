@@ -3,12 +3,14 @@
 
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse.linalg
 import warnings
 from tenpy.models.xxz_chain import XXZChain
 from tenpy.models.lattice import Square
 
 from tenpy.networks import mps, site
 from tenpy.networks.terms import TermList
+from tenpy.tools import optimization
 from random_test import rand_permutation, random_MPS
 import tenpy.linalg.np_conserved as npc
 
@@ -52,6 +54,38 @@ def test_mps():
     assert (eval_x[L // 2] - np.sin(theta) * np.cos(phi)) < 1.e-12
 
 
+@pytest.mark.parametrize("bc", ['finite', 'infinite'])
+def test_from_product_state_basis(bc):
+    # the short-cut for basis states should give the same as with 1D arrays for each site
+    fs = site.SpinHalfFermionSite(cons_N='N', cons_Sz='Sz')
+    sites = [fs] * 4
+    p_state = ['up', 2, 'full', 0]  # int entries are indices as for conserve=None
+    p_state_flat = [
+        np.eye(fs.dim)[fs.perm[fs.state_labels['up']]],
+        np.eye(fs.dim)[2],
+        np.eye(fs.dim)[fs.perm[fs.state_labels['full']]],
+        np.eye(fs.dim)[0],
+    ]
+    psi = mps.MPS.from_product_state(sites, p_state, bc=bc, chargeL=[1, -1])
+    psi.test_sanity()
+    psi_flat = mps.MPS.from_product_state(sites, p_state_flat, bc=bc, chargeL=[1, -1])
+    for B, B_flat in zip(psi._B, psi_flat._B):
+        assert B.get_leg_labels() == B_flat.get_leg_labels()
+        for leg, leg_flat in zip(B.legs, B_flat.legs):
+            leg.test_equal(leg_flat)
+        npt.assert_array_equal(B.qtotal, B_flat.qtotal)
+        npt.assert_array_equal(B.to_ndarray(), B_flat.to_ndarray())
+
+
+def test_mps_test_sanity_optimization():
+    psi = mps.MPS.from_product_state([spin_half] * 4, ['up', 'down'] * 2, bc='finite')
+    psi.form[0] = 'B'  # invalid: should be a tuple
+    with pytest.raises(AssertionError):
+        psi.test_sanity()
+    with optimization.temporary_level(optimization.OptimizationFlag.skip_arg_checks):
+        psi.test_sanity()  # skipped: doesn't raise
+
+
 def test_mps_add():
     s = site.SpinHalfSite(conserve='Sz')
     u, d = 'up', 'down'
@@ -121,12 +155,12 @@ def test_singlet_mps():
     print(ent_segm)
     npt.assert_array_almost_equal_nulp(ent_segm, [2, 3, 1, 3, 2], 5)
     coord, mutinf = psi.mutinf_two_site()
-    coord = [(i, j) for i, j in coord]
+    coord_index = {(i, j): k for k, (i, j) in enumerate(coord)}
     mutinf[np.abs(mutinf) < 1.e-14] = 0.
     mutinf /= np.log(2)
     print(mutinf)
     for (i, j) in pairs:
-        k = coord.index((i, j))
+        k = coord_index[(i, j)]
         mutinf[k] -= 2.  # S(i)+S(j)-S(ij) = (1+1-0)*log(2)
     npt.assert_array_almost_equal(mutinf, 0., decimal=14)
     product_state = [None] * L
@@ -182,19 +216,32 @@ def test_mps_swap():
     perm = rand_permutation(L)
     pairs_perm = [(perm[i], perm[j]) for i, j in pairs]
     psi_perm = mps.MPS.from_singlets(spin_half, L, pairs_perm, bc='finite')
+    psi_threads = psi.copy()
     psi.permute_sites(perm, verbose=2)
     print(psi.overlap(psi_perm), psi.norm_test())
     assert abs(abs(psi.overlap(psi_perm)) - 1.) < 1.e-10
+    psi_threads.permute_sites(perm, num_threads=2)
+    assert abs(abs(psi_threads.overlap(psi_perm)) - 1.) < 1.e-10
 
 
 def test_TransferMatrix(chi=4, d=2):
     psi = random_MPS(2, d, chi, bc='infinite', form=None)
-    full_TM = npc.tensordot(psi._B[0], psi._B[0].conj(), axes=['p', 'p*'])
-    full_TM = npc.tensordot(full_TM, psi._B[1], axes=['vR', 'vL'])
-    full_TM = npc.tensordot(full_TM, psi._B[1].conj(), axes=[['vR*', 'p'], ['vL*', 'p*']])
-    full_TM = full_TM.combine_legs([['vL', 'vL*'], ['vR', 'vR*']], qconj=[+1, -1])
-    full_TM_dense = full_TM.to_ndarray()
-    eta_full, w_full = np.linalg.eig(full_TM_dense)
+    # reference: apply the transfer matrix to flat `RP` with legs vL, vL* without building it
+    B0, B1 = [B.transpose(['vL', 'p', 'vR']).to_ndarray() for B in psi._B]
+    B0c, B1c = B0.conj(), B1.conj()
+    chi0, chi2 = B0.shape[0], B1.shape[2]
+    subscripts = 'asb,btc,cC,BtC,AsB->aA'
+    path = np.einsum_path(subscripts, B0, B1, np.ones((chi2, chi2)), B1c, B0c,
+                          optimize='optimal')[0]
+
+    def TM_matvec(vec):
+        vec = np.einsum(subscripts, B0, B1, vec.reshape(chi2, chi2), B1c, B0c, optimize=path)
+        return vec.reshape(chi0 * chi0)
+
+    TM_flat = scipy.sparse.linalg.LinearOperator((chi0**2, chi2**2),
+                                                 matvec=TM_matvec,
+                                                 dtype=psi.dtype)
+    eta_full, w_full = scipy.sparse.linalg.eigs(TM_flat, k=3, which='LM')
     sort = np.argsort(np.abs(eta_full))[::-1]
     eta_full = eta_full[sort]
     w_full = w_full[:, sort]
@@ -210,7 +257,7 @@ def test_TransferMatrix(chi=4, d=2):
         npt.assert_allclose(eta[:3], eta_full[:3].conj())
     # compare largest eigenvector
     w0_full = w_full[:, 0]
-    w0 = w[0].to_ndarray()
+    w0 = w[0].split_legs().transpose(['vL', 'vL*']).to_ndarray().reshape(chi0**2)
     assert (abs(np.sum(w0_full)) > 1.e-20)  # should be the case for random stuff
     w0_full /= np.sum(w0_full)  # fixes norm & phase
     w0 /= np.sum(w0)
@@ -393,6 +440,9 @@ def test_correlation_function():
     corr3_long = psi3.correlation_function('Cdu', 'Cu', [0], range(4, 11 * 4, 4)).flatten()
     corr3_long2 = psi3.term_correlation_function_right([('Cdu', 0)], [('Cu', 0)])
     npt.assert_array_almost_equal(corr3_long, corr3_long2)
+    # translation invariance by the unit cell: same result when moving the left term instead
+    corr3_long3 = psi3.term_correlation_function_left([('Cdu', 0)], [('Cu', 0)])
+    npt.assert_array_almost_equal(corr3_long, corr3_long3)
 
 
 def test_expectation_value_multisite():
@@ -56,6 +56,8 @@ def check_svd_function(svd_function):
 
 def test_svd():
     check_svd_function(svd_robust.svd)
+    # the second run uses the same shapes and hence cached workspace sizes
+    check_svd_function(svd_robust.svd)
 
 
 def test_svd_gesvd():
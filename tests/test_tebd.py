@@ -7,22 +7,32 @@ import numpy as np
 from tenpy.networks.mps import MPS
 from tenpy.models.spins import SpinChain
 import tenpy.algorithms.tebd as tebd
+from tenpy.algorithms.truncation import TruncationError
 from tenpy.networks.site import SpinHalfSite
 from tenpy.algorithms.exact_diag import ExactDiag
 import pytest
 
 from test_dmrg import e0_tranverse_ising
 
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
 
 def test_trotter_decomposition():
     # check that the time steps sum up to what we expect
-    for order in [1, 2, 4]:
+    for order in [1, 2, 4, '4_opt']:
         dt = tebd.Engine.suzuki_trotter_time_steps(order)
         for N in [1, 2, 5]:
             evolved = [0., 0.]
-            for j, k in tebd.Engine.suzuki_trotter_decomposition(order, N):
+            steps = tebd.Engine.suzuki_trotter_decomposition(order, N)
+            for j, k in steps:
                 evolved[k] += dt[j]
             npt.assert_array_almost_equal_nulp(evolved, N * np.ones([2]), N * 2)
+            # subsequent steps of the same parity should be merged
+            for (j1, k1), (j2, k2) in zip(steps[:-1], steps[1:]):
+                assert k1 != k2
 
 
 @pytest.mark.slow
@@ -110,3 +120,230 @@ def test_RandomUnitaryEvolution():
     eng.run()
     print(eng.psi.chi)
     assert tuple(eng.psi.chi) == (16, 8)
+
+
+def test_time_evolution():
+    L = 4
+    model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS='finite', conserve='Sz')
+    M = SpinChain(model_pars)
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    psi2 = psi.copy()
+    tebd_param = {'dt': 0.05, 'N_steps': 4, 'order': 2, 'trunc_params': {'chi_max': 8}}
+    trunc_err = tebd.time_evolution(psi, M, tebd_param)
+    assert isinstance(trunc_err, TruncationError)
+    engine = tebd.Engine(psi2, M, tebd_param)
+    engine.run()
+    assert abs(psi.overlap(psi2) - 1.) < 1.e-12
+
+
+@pytest.mark.parametrize('bc_MPS', ['finite', 'infinite'])
+def test_tebd_num_threads(bc_MPS):
+    L = 6 if bc_MPS == 'finite' else 4
+    model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS=bc_MPS, conserve='Sz')
+    M = SpinChain(model_pars)
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc=bc_MPS)
+    psi_threads = psi.copy()
+    tebd_param = {'dt': 0.05, 'N_steps': 4, 'order': 2, 'trunc_params': {'chi_max': 8}}
+    tebd.time_evolution(psi, M, tebd_param)
+    tebd_param['num_threads'] = 2
+    tebd_param['parallel_threshold_chi'] = 1
+    tebd.time_evolution(psi_threads, M, tebd_param)
+    for i in range(L):
+        npt.assert_array_almost_equal_nulp(psi.get_B(i).to_ndarray(),
+                                           psi_threads.get_B(i).to_ndarray(), 10)
+
+
+@pytest.mark.parametrize('bc_MPS', ['finite', 'infinite'])
+def test_QRBasedEngine(bc_MPS):
+    L = 6 if bc_MPS == 'finite' else 2
+    model_pars = dict(L=L, S=1., Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS=bc_MPS, conserve='Sz')
+    M = SpinChain(model_pars)
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc=bc_MPS)
+    psi_qr = psi.copy()
+    psi_threads = psi.copy()
+    tebd_param = {
+        'dt': 0.05,
+        'N_steps': 10,
+        'order': 2,
+        'trunc_params': {
+            'chi_max': 20,
+            'svd_min': 1.e-10
+        }
+    }
+    eng = tebd.Engine(psi, M, tebd_param)
+    eng.run()
+    tebd_param['cbe_expand'] = 0.2
+    eng_qr = tebd.QRBasedEngine(psi_qr, M, tebd_param)
+    np.random.seed(5)
+    eng_qr.run()
+    psi_qr.test_sanity()
+    assert np.max(psi_qr.norm_test()) < 1.e-8
+    assert tuple(psi.chi) == tuple(psi_qr.chi)
+    assert abs(eng.trunc_err.eps - eng_qr.trunc_err.eps) < 1.e-9
+    npt.assert_allclose(psi.expectation_value('Sz'), psi_qr.expectation_value('Sz'), atol=1.e-6)
+    npt.assert_allclose(psi.entanglement_entropy(), psi_qr.entanglement_entropy(), atol=1.e-6)
+    # the random sketches are reproducible, even with `num_threads`
+    tebd_param.update(num_threads=2, parallel_threshold_chi=1)
+    eng_threads = tebd.QRBasedEngine(psi_threads, M, tebd_param)
+    np.random.seed(5)
+    eng_threads.run()
+    for i in range(L):
+        npt.assert_array_equal(psi_qr.get_B(i).to_ndarray(), psi_threads.get_B(i).to_ndarray())
+
+
+@pytest.mark.parametrize('bc_MPS', ['finite', 'infinite'])
+def test_tebd_no_charges(bc_MPS):
+    # without charges, `update` uses dense numpy arrays: compare with Sz conservation
+    L = 6 if bc_MPS == 'finite' else 4
+    tebd_param = {'dt': 0.05, 'N_steps': 5, 'order': 2, 'trunc_params': {'chi_max': 6}}
+    results = []
+    for conserve in [None, 'Sz']:
+        model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS=bc_MPS, conserve=conserve)
+        M = SpinChain(model_pars)
+        psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc=bc_MPS)
+        eng = tebd.Engine(psi, M, tebd_param)
+        eng.run()
+        psi.test_sanity()
+        results.append((psi, eng.trunc_err))
+    (psi, err), (psi_Sz, err_Sz) = results
+    assert tuple(psi.chi) == tuple(psi_Sz.chi)
+    assert abs(err.eps - err_Sz.eps) < 1.e-12
+    npt.assert_allclose(psi.expectation_value('Sz'), psi_Sz.expectation_value('Sz'), atol=1.e-12)
+    npt.assert_allclose(psi.entanglement_entropy(), psi_Sz.entanglement_entropy(), atol=1.e-12)
+    # compare with the bond-wise updates in `update_step`
+    M = SpinChain(dict(model_pars, conserve=None))
+    psi_bonds = psi.copy()
+    eng = tebd.Engine(psi, M, tebd_param)
+    eng.calc_U(2, 0.05)
+    eng.update(2)
+    eng_bonds = tebd.Engine(psi_bonds, M, tebd_param)
+    eng_bonds.calc_U(2, 0.05)
+    for U_idx_dt, odd in eng_bonds.suzuki_trotter_decomposition(2, 2):
+        eng_bonds.update_step(U_idx_dt, odd)
+    psi_bonds.test_sanity()
+    for i in range(L):
+        npt.assert_allclose(psi_bonds.get_B(i).to_ndarray(),
+                            psi.get_B(i).to_ndarray(),
+                            atol=1.e-14)
+
+
+@pytest.mark.parametrize('bc_MPS', ['finite', 'infinite'])
+def test_tebd_dense_charges(bc_MPS):
+    # with charges and small theta, `update_bond` uses dense numpy arrays in each charge sector
+    L = 6 if bc_MPS == 'finite' else 2
+    model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS=bc_MPS, conserve='Sz')
+    M = SpinChain(model_pars)
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc=bc_MPS)
+    psi_dense = psi.copy()
+    tebd_param = {'dt': 0.05, 'N_steps': 5, 'order': 2, 'trunc_params': {'chi_max': 6}}
+    eng = tebd.Engine(psi, M, dict(tebd_param, dense_threshold_size=0))
+    eng.run()
+    eng_dense = tebd.Engine(psi_dense, M, tebd_param)
+    eng_dense.run()
+    psi_dense.test_sanity()
+    assert eng_dense._dense_sectors[1] is not None
+    assert eng_dense._theta_size(1) == np.prod(psi_dense.get_theta(0, n=2).shape)
+    assert tuple(psi.chi) == tuple(psi_dense.chi)
+    assert abs(eng.trunc_err.eps - eng_dense.trunc_err.eps) < 1.e-12
+    npt.assert_allclose(psi.expectation_value('Sz'),
+                        psi_dense.expectation_value('Sz'),
+                        atol=1.e-12)
+    npt.assert_allclose(psi.entanglement_entropy(), psi_dense.entanglement_entropy(), atol=1.e-12)
+    assert abs(psi.overlap(psi_dense) - 1.) < 1.e-12
+
+
+def test_tebd_theta_pipes():
+    L = 6
+    model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, bc_MPS='finite', conserve='Sz')
+    M = SpinChain(model_pars)
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    tebd_param = {'dt': 0.05, 'N_steps': 5, 'order': 2, 'trunc_params': {'chi_max': 4}}
+    eng = tebd.Engine(psi, M, dict(tebd_param, dense_threshold_size=0))
+    eng.run()
+    psi.test_sanity()
+    i = 2
+    theta = psi.get_theta(i - 1, n=2, formL=0.)
+    pipes, vL_index = eng._get_theta_pipes(i, theta)
+    assert eng._get_theta_pipes(i, theta)[0] is pipes  # cached
+    expected = theta.combine_legs([('vL', 'p0'), ('p1', 'vR')], qconj=[+1, -1])
+    combined = theta.combine_legs([('vL', 'p0'), ('p1', 'vR')], pipes=pipes)
+    npt.assert_equal(combined.to_ndarray(), expected.to_ndarray())
+    # scaling the combined leg with `vL_index`
+    S = psi.get_SL(i - 1)
+    expected = theta.scale_axis(S, 'vL').combine_legs([('vL', 'p0'), ('p1', 'vR')], pipes=pipes)
+    combined = combined.scale_axis(S[vL_index], '(vL.p0)')
+    npt.assert_equal(combined.to_ndarray(), expected.to_ndarray())
+    # different legs require new pipes
+    theta_1 = psi.get_theta(0, n=2, formL=0.)
+    assert eng._get_theta_pipes(i, theta_1)[0] is not pipes
+
+
+def test_tebd_dtype():
+    L = 6
+    model_pars = dict(L=L, Jx=1., Jy=1., Jz=0.5, bc_MPS='finite', conserve='Sz')
+    M = SpinChain(model_pars)
+    tebd_param = {'dt': 0.05, 'N_steps': 5, 'order': 2, 'trunc_params': {'chi_max': 8}}
+    for Engine in [tebd.Engine, tebd.QRBasedEngine]:
+        results = []
+        for dtype in [None, np.complex64]:
+            psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2),
+                                         bc='finite')
+            trunc_params = dict(tebd_param['trunc_params'])
+            if dtype is not None:
+                trunc_params['svd_min'] = 1.e-7
+            eng = Engine(psi, M, dict(tebd_param, dtype=dtype, trunc_params=trunc_params))
+            eng.run()
+            psi.test_sanity()
+            results.append(psi)
+        psi, psi_c64 = results
+        assert psi_c64.dtype == np.complex64
+        assert all(B.dtype == np.complex64 for B in psi_c64._B)
+        assert all(S.dtype == np.float32 for S in psi_c64._S)
+        npt.assert_allclose(psi_c64.expectation_value('Sz'),
+                            psi.expectation_value('Sz'),
+                            atol=1.e-5)
+    tebd_param['trunc_params']['svd_min'] = 1.e-7
+    with pytest.raises(ValueError):
+        tebd.Engine(psi, M, {'dtype': np.complex64, 'trunc_params': {'svd_min': 1.e-10}})
+    with pytest.raises(ValueError):
+        eng = tebd.Engine(psi.copy(), M, dict(tebd_param, dtype=np.float64))
+        eng.run()
+    psi_rand = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    eng = tebd.RandomUnitaryEvolution(psi_rand, dict(tebd_param, dtype=np.complex64))
+    eng.run()
+    assert all(B.dtype == np.complex64 for B in psi_rand._B)
+
+
+def test_tebd_backend():
+    L = 4
+    M = SpinChain(dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS='finite', conserve=None))
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    with pytest.raises(ValueError):
+        tebd.Engine(psi, M, {'backend': 'unknown'})
+
+
+@pytest.mark.skipif(cupy is None, reason="cupy not available")
+def test_tebd_backend_cupy():
+    L = 4
+    M = SpinChain(dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS='finite', conserve=None))
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    tebd_param = {'dt': 0.05, 'N_steps': 5, 'order': 2, 'trunc_params': {'chi_max': 6}}
+    psi_gpu = psi.copy()
+    tebd.time_evolution(psi, M, tebd_param)
+    tebd.time_evolution(psi_gpu, M, dict(tebd_param, backend='cupy'))
+    psi_gpu.test_sanity()
+    npt.assert_allclose(psi_gpu.expectation_value('Sz'), psi.expectation_value('Sz'), atol=1.e-12)
+
+
+def test_tebd_dense_U_bond():
+    L = 4
+    M = SpinChain(dict(L=L, Jx=1., Jy=1., Jz=0.5, hz=0.1, bc_MPS='finite', conserve=None))
+    psi = MPS.from_product_state(M.lat.mps_sites(), ['up', 'down'] * (L // 2), bc='finite')
+    eng = tebd.Engine(psi, M, {'dt': 0.05, 'N_steps': 2, 'order': 2})
+    eng.run()
+    U_bond = eng._U[0][1]
+    U_dense = eng._dense_U_bond(U_bond)
+    assert eng._dense_U_bond(U_bond) is U_dense  # cached
+    npt.assert_equal(U_dense, U_bond.transpose(['p0', 'p1', 'p0*', 'p1*']).to_ndarray())
+    eng.calc_U(2, 0.1)
+    assert len(eng._U_dense) == 0